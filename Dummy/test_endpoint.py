@@ -8,14 +8,41 @@
 
 
 from pathlib import Path
-import pandas as pd, requests, time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import pyarrow.parquet as pq, requests, time
+from requests.adapters import HTTPAdapter
 
-df = pd.read_parquet("../data/processed/test.parquet")
-payload = df.drop(columns=["Class"]).iloc[0].to_dict()
+URL = "http://localhost:8000/predict"
+N_REQUESTS = 1000
+# Keep in line with what the server can take concurrently (uvicorn workers/connections)
+MAX_WORKERS = 16
 
-for i in range(100):
-    r = requests.post("http://localhost:8000/predict", json=payload, timeout=10)
-    if i % 10 == 0: print(i, r.status_code)
-    time.sleep(0.1)  # 10 req/s; adjust if you like
+# One keep-alive connection pool shared by every request, one connection per worker
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS))
 
+# Project away "Class" at read time and pull the first row straight from Arrow
+test_path = "../data/processed/test.parquet"
+columns = [c for c in pq.read_schema(test_path).names if c != "Class"]
+tbl = pq.read_table(test_path, columns=columns)
+payload = {name: tbl.column(name)[0].as_py() for name in tbl.column_names}
 
+
+def send(_):
+    t0 = time.perf_counter()
+    r = session.post(URL, json=payload, timeout=10)
+    return r.status_code, time.perf_counter() - t0
+
+
+start = time.perf_counter()
+with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+    results = list(ex.map(send, range(N_REQUESTS)))
+elapsed = time.perf_counter() - start
+
+latencies = sorted(lat for _, lat in results)
+print(f"{N_REQUESTS} requests, {MAX_WORKERS} workers: {elapsed:.2f}s ({N_REQUESTS / elapsed:.0f} req/s)")
+print("status codes:", dict(Counter(code for code, _ in results)))
+for pct in (50, 90, 95, 99):
+    idx = min(len(latencies) - 1, int(len(latencies) * pct / 100))
+    print(f"p{pct}: {latencies[idx] * 1000:.2f} ms")
@@ -1,20 +1,56 @@
+import argparse
 import sqlite3
 
-conn = sqlite3.connect('mlflow/mlflow.db')
+DB_PATH = 'mlflow/mlflow.db'
+RUNS_QUERY = 'SELECT run_uuid, artifact_uri FROM runs ORDER BY start_time DESC LIMIT 5'
+VERSIONS_QUERY = 'SELECT version, run_id, source FROM model_versions WHERE name = ? ORDER BY version'
+
+
+def provision(db_path: str = DB_PATH):
+    """One-off writable setup: WAL journaling and the indexes used by the queries below."""
+    conn = sqlite3.connect(db_path)
+    # WAL lets readers like this script run without blocking the MLflow server's writes
+    conn.execute('PRAGMA journal_mode=WAL')
+    # Index the two lookups so they stay index scans as the registry grows.
+    # The model_versions index covers run_id/source, so rows are never fetched from the table.
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_model_versions_name_version '
+                 'ON model_versions(name, version DESC, run_id, source)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_runs_start_time ON runs(start_time DESC)')
+    conn.commit()
+    conn.close()
+
+
+parser = argparse.ArgumentParser(description="Inspect the MLflow SQLite backend")
+parser.add_argument("--provision", action="store_true",
+                    help="Enable WAL and create indexes (opens the DB read-write)")
+args = parser.parse_args()
+
+if args.provision:
+    provision()
+
+# Read-only: never takes a write lock against a running MLflow server
+conn = sqlite3.connect(f'file:{DB_PATH}?mode=ro', uri=True)
+conn.execute('PRAGMA query_only=1')
+conn.execute('PRAGMA cache_size=-65536')  # 64 MB page cache
 cursor = conn.cursor()
 
-print("=== Experiments ===")
+print("=== Query Plans ===")
+for query, params in ((RUNS_QUERY, ()), (VERSIONS_QUERY, ("credit-fraud",))):
+    for row in cursor.execute(f'EXPLAIN QUERY PLAN {query}', params):
+        print(row[-1])
+
+print("\n=== Experiments ===")
 cursor.execute('SELECT experiment_id, name, artifact_location FROM experiments')
 for row in cursor.fetchall():
     print(row)
 
 print("\n=== Recent Runs ===")
-cursor.execute('SELECT run_uuid, artifact_uri FROM runs ORDER BY start_time DESC LIMIT 5')
+cursor.execute(RUNS_QUERY)
 for row in cursor.fetchall():
     print(row)
 
 print("\n=== Model Versions ===")
-cursor.execute('SELECT version, run_id, source FROM model_versions WHERE name="credit-fraud" ORDER BY version')
+cursor.execute(VERSIONS_QUERY, ("credit-fraud",))
 for row in cursor.fetchall():
     print(row)
 
@@ -11,11 +11,19 @@ Usage:
 import os
 import sys
 import argparse
+import functools
 import subprocess
 import mlflow
 from mlflow.tracking import MlflowClient
 
 
+@functools.lru_cache(maxsize=1)
+def _client():
+    """MLflow client shared by every helper in this invocation."""
+    mlflow.set_tracking_uri(os.getenv("MLFLOW_TRACKING_URI", "http://localhost:5000"))
+    return MlflowClient()
+
+
 def run_command(cmd: list, description: str):
     """Run a shell command and return success status."""
     print(f"\n{description}...")
@@ -42,11 +50,8 @@ def promote_and_restart(model_name: str, version: str, alias: str, compose_file:
         alias: Alias to set (e.g., 'production')
         compose_file: Path to docker-compose.yaml
     """
-    # Configure MLflow
-    mlflow_uri = os.getenv("MLFLOW_TRACKING_URI", "http://localhost:5000")
-    mlflow.set_tracking_uri(mlflow_uri)
-
-    client = MlflowClient()
+    client = _client()
+    mlflow_uri = mlflow.get_tracking_uri()
 
     print("=" * 80)
     print("MODEL PROMOTION AND RESTART")
@@ -112,20 +117,32 @@ def promote_and_restart(model_name: str, version: str, alias: str, compose_file:
         return False
 
 
-def list_versions(model_name: str):
-    """List all versions of a model with their aliases."""
-    mlflow_uri = os.getenv("MLFLOW_TRACKING_URI", "http://localhost:5000")
-    mlflow.set_tracking_uri(mlflow_uri)
-    client = MlflowClient()
-
+def _search_versions(client: MlflowClient, model_name: str, limit: int):
+    """Newest-first model versions, ordered and truncated by the tracking server when it can."""
     try:
+        return client.search_model_versions(
+            filter_string=f"name='{model_name}'",
+            order_by=["version_number DESC"],
+            max_results=limit,
+        )
+    except Exception:
+        # Backend without order_by support: sort client-side
         versions = client.search_model_versions(f"name='{model_name}'")
+        return sorted(versions, key=lambda x: int(x.version), reverse=True)[:limit]
+
+
+def list_versions(model_name: str, limit: int = 50):
+    """List the most recent versions of a model with their aliases."""
+    client = _client()
+
+    try:
+        versions = _search_versions(client, model_name, limit)
         print(f"\nAvailable versions for model '{model_name}':")
         print("-" * 80)
         print(f"{'Version':<10} {'Run ID':<35} {'Aliases':<20} {'Status':<15}")
         print("-" * 80)
 
-        for mv in sorted(versions, key=lambda x: int(x.version), reverse=True):
+        for mv in versions:
             aliases = ", ".join(mv.aliases) if hasattr(mv, 'aliases') and mv.aliases else "None"
             print(f"{mv.version:<10} {mv.run_id:<35} {aliases:<20} {mv.status:<15}")
 
@@ -12,11 +12,19 @@ Usage:
 import os
 import sys
 import argparse
+import functools
 import mlflow
 from mlflow.tracking import MlflowClient
 import requests
 
 
+@functools.lru_cache(maxsize=1)
+def _client():
+    """MLflow client shared by every helper in this invocation."""
+    mlflow.set_tracking_uri(os.getenv("MLFLOW_TRACKING_URI", "http://localhost:5000"))
+    return MlflowClient()
+
+
 def promote_model(model_name: str, version: str, alias: str, reload_app: bool = False, app_url: str = None):
     """
     Promote a model version by setting an alias in MLflow.
@@ -28,11 +36,8 @@ def promote_model(model_name: str, version: str, alias: str, reload_app: bool =
         reload_app: Whether to trigger app reload after promotion
         app_url: URL of the app server (for reload)
     """
-    # Configure MLflow
-    mlflow_uri = os.getenv("MLFLOW_TRACKING_URI", "http://localhost:5000")
-    mlflow.set_tracking_uri(mlflow_uri)
-
-    client = MlflowClient()
+    client = _client()
+    mlflow_uri = mlflow.get_tracking_uri()
 
     print(f"Connecting to MLflow at: {mlflow_uri}")
     print(f"Model: {model_name}")
@@ -95,20 +100,32 @@ def promote_model(model_name: str, version: str, alias: str, reload_app: bool =
         return False
 
 
-def list_versions(model_name: str):
-    """List all versions of a model with their aliases."""
-    mlflow_uri = os.getenv("MLFLOW_TRACKING_URI", "http://localhost:5000")
-    mlflow.set_tracking_uri(mlflow_uri)
-    client = MlflowClient()
-
+def _search_versions(client: MlflowClient, model_name: str, limit: int):
+    """Newest-first model versions, ordered and truncated by the tracking server when it can."""
     try:
+        return client.search_model_versions(
+            filter_string=f"name='{model_name}'",
+            order_by=["version_number DESC"],
+            max_results=limit,
+        )
+    except Exception:
+        # Backend without order_by support: sort client-side
         versions = client.search_model_versions(f"name='{model_name}'")
+        return sorted(versions, key=lambda x: int(x.version), reverse=True)[:limit]
+
+
+def list_versions(model_name: str, limit: int = 50):
+    """List the most recent versions of a model with their aliases."""
+    client = _client()
+
+    try:
+        versions = _search_versions(client, model_name, limit)
         print(f"\nAvailable versions for model '{model_name}':")
         print("-" * 80)
         print(f"{'Version':<10} {'Run ID':<35} {'Aliases':<20} {'Status':<15}")
         print("-" * 80)
 
-        for mv in sorted(versions, key=lambda x: int(x.version), reverse=True):
+        for mv in versions:
             aliases = ", ".join(mv.aliases) if hasattr(mv, 'aliases') and mv.aliases else "None"
             print(f"{mv.version:<10} {mv.run_id:<35} {aliases:<20} {mv.status:<15}")
 
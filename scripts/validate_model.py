@@ -15,11 +15,67 @@ Usage:
 import os
 import sys
 import argparse
+import tempfile
 import mlflow
 from mlflow.tracking import MlflowClient
-import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from sklearn.metrics import roc_auc_score, classification_report
 import numpy as np
+import joblib
+import warnings
+
+CACHE_DIR = os.path.expanduser(os.getenv("VALIDATION_CACHE_DIR", "~/.cache/fraud-val"))
+
+
+def load_production_model(client: MlflowClient, model_name: str, alias: str = "production"):
+    """
+    Load the aliased model, reusing a local copy keyed by its run ID.
+
+    Promotions move the alias to a different run, which naturally misses the cache.
+    """
+    run_id = client.get_model_version_by_alias(model_name, alias).run_id
+    cache_path = os.path.join(CACHE_DIR, f"{run_id}.joblib")
+    if os.path.exists(cache_path):
+        return joblib.load(cache_path)
+    model = mlflow.sklearn.load_model(f"models:/{model_name}@{alias}")
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # Dump to a temp name and rename, so a concurrent or killed run never leaves a truncated cache file
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            joblib.dump(model, f)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return model
+
+
+def feature_matrix(model, table: pa.Table) -> np.ndarray:
+    """
+    Float32 feature matrix in the column order the model was fitted with.
+
+    Models without feature_names_in_ get the table's own column order.
+    """
+    names = getattr(model, "feature_names_in_", None)
+    columns = list(names) if names is not None else table.column_names
+    X = np.empty((table.num_rows, len(columns)), dtype=np.float32)
+    for j, c in enumerate(columns):
+        X[:, j] = table.column(c).to_numpy()
+    return X
+
+
+def positive_proba(model, table: pa.Table) -> np.ndarray:
+    """Fraud-class probabilities as a float32 vector."""
+    X = feature_matrix(model, table)
+    out = np.empty(len(X), dtype=np.float32)
+    with warnings.catch_warnings():
+        if getattr(model, "feature_names_in_", None) is not None:
+            # Columns were just ordered by feature_names_in_, so the missing-names warning is moot
+            warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        out[:] = model.predict_proba(X)[:, 1]
+    return out
 
 
 def validate_model(model_name: str, version: str, min_auc: float = 0.95):
@@ -58,11 +114,13 @@ def validate_model(model_name: str, version: str, min_auc: float = 0.95):
             print(f"  Skipping performance validation")
             return True  # Allow promotion without test data
 
-        test_df = pd.read_parquet(test_path)
-        # Drop Time feature - models are trained without it
-        X_test = test_df.drop(["Class", "Time"], axis=1, errors='ignore')
-        y_test = test_df["Class"]
-        print(f"  ✓ Loaded {len(test_df)} test samples")
+        # Project away Time at read time - models are trained without it
+        columns = [c for c in pq.read_schema(test_path).names if c != "Time"]
+        table = pq.read_table(test_path, columns=columns)
+        y_test = table.column("Class").to_numpy()
+        X_table = table.drop_columns(["Class"])
+        del table
+        print(f"  ✓ Loaded {X_table.num_rows} test samples")
 
         # 3. Load and test model
         print(f"\n[3/5] Loading model and computing metrics...")
@@ -76,7 +134,7 @@ def validate_model(model_name: str, version: str, min_auc: float = 0.95):
 
         # Make predictions
         try:
-            predictions = model.predict_proba(X_test)[:, 1]
+            predictions = positive_proba(model, X_table)
             pred_binary = (predictions >= 0.5).astype(int)
         except Exception as e:
             print(f"  ❌ Failed to make predictions: {e}")
@@ -116,9 +174,9 @@ def validate_model(model_name: str, version: str, min_auc: float = 0.95):
         # 5. Compare with production model
         print(f"\n[5/5] Comparing with production model...")
         try:
-            prod_model = mlflow.sklearn.load_model(f"models:/{model_name}@production")
-            # Use same preprocessed X_test (already has Time removed)
-            prod_predictions = prod_model.predict_proba(X_test)[:, 1]
+            prod_model = load_production_model(client, model_name)
+            # Reuse the Arrow table already in memory (Time projected away) - no reload
+            prod_predictions = positive_proba(prod_model, X_table)
             prod_auc = roc_auc_score(y_test, prod_predictions)
 
             print(f"  Production AUC: {prod_auc:.4f}")
@@ -1,16 +1,26 @@
 import os
 import mlflow
 from mlflow.tracking import MlflowClient
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 from starlette.responses import Response, JSONResponse
 from .metrics import REQUEST_COUNT, REQUEST_LATENCY
+from .batching import PredictionBatcher, PredictionLogger, predict_proba_ordered
+import hashlib
 import joblib
+import shutil
+import tempfile
 import time
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
 from datetime import datetime
 
-app = FastAPI(title="Credit Fraud API")
+# orjson serializes straight to bytes, several times faster than stdlib json for small bodies
+app = FastAPI(title="Credit Fraud API", default_response_class=ORJSONResponse)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -23,7 +33,24 @@ MODEL_PATH = os.getenv("MODEL_PATH", "models/latest.joblib")
 MODEL_NAME = os.getenv("MODEL_NAME", "credit-fraud")
 MODEL_ALIAS = os.getenv("MODEL_ALIAS", "production")
 MODEL_STAGE = os.getenv("MODEL_STAGE", "Production")
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", "models/cache")
+PREDICT_CACHE_SIZE = int(os.getenv("PREDICT_CACHE_SIZE", "4096"))
+# Serve through onnxruntime when the model artifact ships a model.onnx
+USE_ONNX = os.getenv("USE_ONNX") == "1"
 _model = None
+# Column order the loaded model was fitted with; None falls back to the DataFrame path
+FEATURE_ORDER = None
+# LRU of recent feature tuples -> fraud probability for the loaded model (retries, probes)
+_proba_cache = OrderedDict()
+# Last registry version deserialized, reused by /reload when the alias has not moved
+_registry_cache = {"key": None, "model": None}
+# Label children bound once so /predict skips the per-call label lookup
+_predict_latency = REQUEST_LATENCY.labels("/predict")
+_predict_ok = REQUEST_COUNT.labels("POST", "/predict", "200")
+_predict_bad_request = REQUEST_COUNT.labels("POST", "/predict", "400")
+_predict_unavailable = REQUEST_COUNT.labels("POST", "/predict", "503")
+# Serializes model loads so concurrent callers share a single download
+_model_lock = threading.Lock()
 _model_info = {
     "source": None,  # alias | stage | local
     "name": None,
@@ -41,61 +68,181 @@ mlflow.set_tracking_uri(os.getenv("MLFLOW_TRACKING_URI", "http://localhost:5000"
 
 # Initialize database on startup
 try:
-    from src.database.models import init_db, get_db, Prediction
+    from src.database.models import init_db, bulk_insert_predictions
     init_db()
     DB_ENABLED = True
 except Exception as e:
     print(f"Database not available: {e}")
     DB_ENABLED = False
 
+def _feature_order(model):
+    """Return the column order the model was fitted with, if it exposes one."""
+    names = getattr(model, "feature_names_in_", None)
+    return list(names) if names is not None else None
+
+
+def _build_features(payload: dict):
+    """Build a single-row model input from a flat feature dict."""
+    if FEATURE_ORDER is None:
+        return pd.DataFrame([payload])
+    return np.fromiter(
+        (payload[c] for c in FEATURE_ORDER), dtype=np.float32, count=len(FEATURE_ORDER)
+    ).reshape(1, -1)
+
+
+def _cache_key(payload: dict):
+    """Hashable key for a payload in the fitted column order, or None on the DataFrame path."""
+    if FEATURE_ORDER is None:
+        return None
+    return tuple(payload[c] for c in FEATURE_ORDER)
+
+
+def _cache_put(key, proba):
+    _proba_cache[key] = proba
+    if len(_proba_cache) > PREDICT_CACHE_SIZE:
+        _proba_cache.popitem(last=False)
+
+
 def load_model():
     global _model
-    global _model_info
+    global FEATURE_ORDER
     if _model is not None:
         return _model
+    with _model_lock:
+        if _model is not None:
+            return _model
+        model = _load_model()
+        if model is not None:
+            FEATURE_ORDER = _feature_order(model)
+            _warmup(model)
+        _proba_cache.clear()
+        _model = model
+    return _model
+
+
+def _warmup(model):
+    """Score one all-zero row so lazily initialised native code runs before real traffic."""
+    if FEATURE_ORDER is None:
+        return
+    try:
+        predict_proba_ordered(model, np.zeros((1, len(FEATURE_ORDER)), dtype=np.float32))
+    except Exception as e:
+        print(f"Model warm-up failed: {e}")
+
+
+def _file_sha256(path: str):
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _maybe_onnx(model, onnx_path: str, pkl_path: str):
+    """
+    Swap in an onnxruntime session for the sklearn pipeline when enabled and available.
+
+    The graph is only used when its model_sha256 metadata matches the pickle at
+    pkl_path, so a stale .onnx never serves scores for a different model.
+    """
+    if not USE_ONNX or not os.path.exists(onnx_path):
+        return model
+    feature_names = _feature_order(model)
+    if feature_names is None:
+        return model
+    try:
+        from .onnx_model import OnnxModel
+        onnx_model = OnnxModel(onnx_path, feature_names)
+    except Exception as e:
+        print(f"ONNX model not used: {e}")
+        return model
+    expected = onnx_model.metadata.get("model_sha256")
+    if expected is None or expected != _file_sha256(pkl_path):
+        print(f"ONNX model not used: {onnx_path} was not exported from {pkl_path}")
+        return model
+    return onnx_model
+
+
+def _download_version(mv):
+    """
+    Download a version's artifact directory to MODEL_CACHE_DIR/<name>/<version>.
+
+    The download lands in a temp dir and is renamed into place, so an interrupted
+    download is never mistaken for a complete one.
+    """
+    local_dir = os.path.join(MODEL_CACHE_DIR, mv.name, str(mv.version))
+    if os.path.exists(os.path.join(local_dir, "MLmodel")):
+        return local_dir
+    parent = os.path.dirname(local_dir)
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix=f".{mv.version}-")
+    try:
+        downloaded = mlflow.artifacts.download_artifacts(artifact_uri=mv.source, dst_path=tmp_dir)
+        # Partial or older-layout leftovers at the final path
+        shutil.rmtree(local_dir, ignore_errors=True)
+        os.replace(downloaded, local_dir)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return local_dir
+
+
+def _load_model_version(mv):
+    """
+    Load a registered model version straight from its pickled artifact.
+
+    The artifact directory is downloaded once into MODEL_CACHE_DIR, and the
+    deserialized object is reused while the resolved version stays the same.
+    """
+    key = (mv.name, mv.version)
+    if _registry_cache["key"] == key:
+        return _registry_cache["model"]
+    local_dir = _download_version(mv)
+    pkl_path = os.path.join(local_dir, "model.pkl")
+    if os.path.exists(pkl_path):
+        model = joblib.load(pkl_path)
+    else:
+        model = mlflow.sklearn.load_model(local_dir)
+    model = _maybe_onnx(model, os.path.join(local_dir, "model.onnx"), pkl_path)
+    _registry_cache.update({"key": key, "model": model})
+    return model
+
+
+def _load_model():
+    global _model_info
     # Try Model Registry by alias first (preferred), then stage (deprecated UI), else local file
     try:
         if MODEL_ALIAS:
-            uri = f"models:/{MODEL_NAME}@{MODEL_ALIAS}"
-            _model = mlflow.sklearn.load_model(uri)
-            try:
-                client = MlflowClient()
-                mv = client.get_model_version_by_alias(MODEL_NAME, MODEL_ALIAS)
-                _model_info.update({
-                    "source": "alias",
-                    "name": MODEL_NAME,
-                    "alias": MODEL_ALIAS,
-                    "stage": None,
-                    "version": mv.version,
-                })
-            except Exception:
-                _model_info.update({"source": "alias", "name": MODEL_NAME, "alias": MODEL_ALIAS})
-            return _model
+            mv = MlflowClient().get_model_version_by_alias(MODEL_NAME, MODEL_ALIAS)
+            model = _load_model_version(mv)
+            _model_info.update({
+                "source": "alias",
+                "name": MODEL_NAME,
+                "alias": MODEL_ALIAS,
+                "stage": None,
+                "version": mv.version,
+            })
+            return model
     except Exception as e:
         _model_info["errors"]["alias"] = str(e)
     try:
         if MODEL_STAGE:
-            uri = f"models:/{MODEL_NAME}/{MODEL_STAGE}"
-            _model = mlflow.sklearn.load_model(uri)
-            try:
-                client = MlflowClient()
-                latest = client.get_latest_versions(MODEL_NAME, stages=[MODEL_STAGE])
-                ver = latest[0].version if latest else None
-                _model_info.update({
-                    "source": "stage",
-                    "name": MODEL_NAME,
-                    "alias": None,
-                    "stage": MODEL_STAGE,
-                    "version": ver,
-                })
-            except Exception:
-                _model_info.update({"source": "stage", "name": MODEL_NAME, "stage": MODEL_STAGE})
-            return _model
+            latest = MlflowClient().get_latest_versions(MODEL_NAME, stages=[MODEL_STAGE])
+            if not latest:
+                raise LookupError(f"No version of {MODEL_NAME} in stage {MODEL_STAGE}")
+            model = _load_model_version(latest[0])
+            _model_info.update({
+                "source": "stage",
+                "name": MODEL_NAME,
+                "alias": None,
+                "stage": MODEL_STAGE,
+                "version": latest[0].version,
+            })
+            return model
     except Exception as e:
         _model_info["errors"]["stage"] = str(e)
         # Fallback to local file artifact
         if os.path.exists(MODEL_PATH):
-            _model = joblib.load(MODEL_PATH)
+            model = joblib.load(MODEL_PATH)
+            model = _maybe_onnx(model, os.path.splitext(MODEL_PATH)[0] + ".onnx", MODEL_PATH)
             _model_info.update({
                 "source": "local",
                 "name": None,
@@ -103,11 +250,36 @@ def load_model():
                 "stage": None,
                 "version": None,
             })
-            return _model
+            return model
         return None
 
+_batcher = PredictionBatcher(load_model)
+_prediction_log = PredictionLogger(bulk_insert_predictions if DB_ENABLED else None)
+
+
+@app.on_event("startup")
+async def _load_model_on_startup():
+    # Load eagerly so the first request does not pay for the registry download
+    load_model()
+
+
+@app.on_event("startup")
+async def _start_batcher():
+    _batcher.start()
+    if DB_ENABLED:
+        _prediction_log.start()
+
+
+@app.on_event("shutdown")
+async def _stop_batcher():
+    await _batcher.stop()
+    await _prediction_log.stop()
+
+
 @app.get("/health")
 async def health():
+    if _model is None:
+        return JSONResponse({"status": "model not loaded"}, status_code=503)
     return {"status": "ok"}
 
 @app.get("/metrics")
@@ -135,9 +307,12 @@ async def reload_model():
     """Reload the model from MLflow registry. Use this after promoting a new model version."""
     global _model
     global _model_info
+    global FEATURE_ORDER
 
     # Clear the cached model
     _model = None
+    FEATURE_ORDER = None
+    _proba_cache.clear()
     _model_info = {
         "source": None,
         "name": None,
@@ -175,49 +350,54 @@ async def reload_model():
             status_code=500
         )
 @app.post("/predict")
-async def predict(payload: dict, db=Depends(get_db) if DB_ENABLED else None):
+async def predict(payload: dict):
     start_time = time.time()
 
-    with REQUEST_LATENCY.labels("/predict").time():
+    with _predict_latency.time():
         model = load_model()
         if model is None:
-            REQUEST_COUNT.labels("POST", "/predict", 503).inc()
-            return JSONResponse({"error": "model not available"}, status_code=503)
+            _predict_unavailable.inc()
+            return ORJSONResponse({"error": "model not available"}, status_code=503)
         try:
             # Expect a flat dict of feature_name: value
-            import numpy as np
-            import pandas as pd
-            X = pd.DataFrame([payload])
-            proba = float(model.predict_proba(X)[:, 1][0])
-            prediction = 1 if proba >= 0.5 else 0
+            key = _cache_key(payload)
+            p = _proba_cache.get(key) if key is not None else None
+            if p is not None:
+                _proba_cache.move_to_end(key)
+            else:
+                X = _build_features(payload)
+                if FEATURE_ORDER is not None and _batcher.is_active():
+                    # Coalesced with concurrent requests into one predict_proba call
+                    p = (await _batcher.predict_proba(X))[1]
+                else:
+                    p = predict_proba_ordered(model, X)[0, 1]
+                # A /reload during the await swaps _model; don't cache the old model's answer for it
+                if key is not None and _model is model:
+                    _cache_put(key, p)
+            prediction = int(p >= 0.5)
+            proba = float(p)
 
             # Calculate latency
             latency_ms = (time.time() - start_time) * 1000
 
-            # Store prediction in database
-            if DB_ENABLED and db is not None:
-                try:
-                    db_prediction = Prediction(
-                        timestamp=datetime.utcnow(),
-                        features=payload,
-                        fraud_probability=proba,
-                        prediction=prediction,
-                        model_version=_model_info.get("version"),
-                        model_name=_model_info.get("name"),
-                        latency_ms=latency_ms
-                    )
-                    db.add(db_prediction)
-                    db.commit()
-                except Exception as db_error:
-                    print(f"Failed to log prediction to database: {db_error}")
-                    db.rollback()
-
-            REQUEST_COUNT.labels("POST", "/predict", 200).inc()
-            return {
+            # Queue prediction for the background database writer
+            if DB_ENABLED:
+                _prediction_log.log({
+                    "timestamp": datetime.utcnow(),
+                    "features": payload,
+                    "fraud_probability": proba,
+                    "prediction": prediction,
+                    "model_version": _model_info.get("version"),
+                    "model_name": _model_info.get("name"),
+                    "latency_ms": latency_ms,
+                })
+
+            _predict_ok.inc()
+            return ORJSONResponse({
                 "fraud_probability": proba,
                 "prediction": prediction,
                 "model_version": _model_info.get("version")
-            }
+            })
         except Exception as e:
-            REQUEST_COUNT.labels("POST", "/predict", 400).inc()
-            return JSONResponse({"error": str(e)}, status_code=400)
+            _predict_bad_request.inc()
+            return ORJSONResponse({"error": str(e)}, status_code=400)
@@ -0,0 +1,186 @@
+"""
+Micro-batching for concurrent prediction requests and prediction logging
+"""
+import asyncio
+import os
+import warnings
+
+import numpy as np
+
+MAX_BATCH = int(os.getenv("MAX_BATCH", "128"))
+MAX_WAIT_MS = float(os.getenv("MAX_WAIT_MS", "5"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "500"))
+LOG_FLUSH_MS = float(os.getenv("LOG_FLUSH_MS", "100"))
+
+
+def predict_proba_ordered(model, X):
+    """
+    predict_proba on rows already in the model's fitted column order.
+
+    Pipelines fitted on a DataFrame warn when scored on a bare ndarray; callers
+    here build arrays from feature_names_in_, so the warning is silenced for
+    this call only.
+    """
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        return model.predict_proba(X)
+
+
+async def _collect(queue: asyncio.Queue, batch: list, max_items: int, max_wait: float):
+    """Append queued items to batch until it holds max_items or max_wait seconds pass"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_wait
+    while len(batch) < max_items:
+        if not queue.empty():
+            batch.append(queue.get_nowait())
+            continue
+        timeout = deadline - loop.time()
+        if timeout <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(queue.get(), timeout))
+        except asyncio.TimeoutError:
+            break
+    return batch
+
+
+class PredictionBatcher:
+    """Coalesce single-row requests arriving within a few ms into one predict_proba call"""
+
+    def __init__(self, get_model, max_batch: int = MAX_BATCH, max_wait_ms: float = MAX_WAIT_MS):
+        self._get_model = get_model
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue = None
+        self._task = None
+
+    def is_active(self) -> bool:
+        """True when the worker is running on the caller's event loop"""
+        if self._task is None or self._task.done():
+            return False
+        try:
+            return self._task.get_loop() is asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+
+    def start(self):
+        """Start the batching worker on the running event loop"""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Cancel the batching worker"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def predict_proba(self, row: np.ndarray) -> np.ndarray:
+        """Queue a (1, n_features) row and wait for its class probabilities"""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((row, future))
+        return await future
+
+    async def _run(self):
+        while True:
+            batch = await _collect(self._queue, [await self._queue.get()], self.max_batch, self.max_wait)
+            self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        model = self._get_model()
+        if model is None:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError("model not available"))
+            return
+        try:
+            proba = predict_proba_ordered(model, np.vstack([row for row, _ in batch]))
+        except Exception:
+            # One bad row should not fail its neighbours; score each row on its own
+            for row, future in batch:
+                if future.done():
+                    continue
+                try:
+                    future.set_result(predict_proba_ordered(model, row)[0])
+                except Exception as e:
+                    future.set_exception(e)
+            return
+        for i, (_, future) in enumerate(batch):
+            if not future.done():
+                future.set_result(proba[i])
+
+
+class PredictionLogger:
+    """Buffer prediction records and write them off the request path in bulk"""
+
+    def __init__(self, write, maxsize: int = LOG_QUEUE_SIZE, batch_size: int = LOG_BATCH_SIZE,
+                 flush_ms: float = LOG_FLUSH_MS):
+        self._write = write
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.flush_interval = flush_ms / 1000
+        self._queue = None
+        self._pending = []
+        self._task = None
+
+    def is_active(self) -> bool:
+        """True when the writer task is running on the caller's event loop"""
+        if self._task is None or self._task.done():
+            return False
+        try:
+            return self._task.get_loop() is asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+
+    def start(self):
+        """Start the writer task on the running event loop"""
+        # A fresh queue per start: an asyncio.Queue binds to the first loop that waits on it
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Cancel the writer task and flush whatever is still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        records, self._pending = self._pending, []
+        while self._queue is not None and not self._queue.empty():
+            records.append(self._queue.get_nowait())
+        if records:
+            await self._flush(records)
+
+    def log(self, record: dict):
+        """Queue a record for the next bulk write; drop it if the buffer is full"""
+        if not self.is_active():
+            # No writer running (e.g. startup events skipped), write inline
+            try:
+                self._write([record])
+            except Exception as e:
+                print(f"Failed to log prediction to database: {e}")
+            return
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            print("Prediction log queue full, dropping record")
+
+    async def _run(self):
+        while True:
+            self._pending = [await self._queue.get()]
+            await _collect(self._queue, self._pending, self.batch_size, self.flush_interval)
+            records, self._pending = self._pending, []
+            await self._flush(records)
+
+    async def _flush(self, records):
+        try:
+            await asyncio.to_thread(self._write, records)
+        except Exception as e:
+            print(f"Failed to log {len(records)} predictions to database: {e}")
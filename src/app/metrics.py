@@ -2,4 +2,10 @@ from prometheus_client import Counter, Histogram
 
 REQUEST_COUNT = Counter("app_request_count", "Total HTTP requests", ["method", "endpoint", "http_status"])
 PREDICTION_COUNT = Counter("app_prediction_count", "Number of predictions", ["status"])
-REQUEST_LATENCY = Histogram("app_request_latency_seconds", "Request latency", ["endpoint"]) 
+# Sub-millisecond to 1s buckets: inference latency would all land in the first default bucket
+REQUEST_LATENCY = Histogram(
+    "app_request_latency_seconds",
+    "Request latency",
+    ["endpoint"],
+    buckets=(0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
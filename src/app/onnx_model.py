@@ -0,0 +1,22 @@
+"""
+onnxruntime-backed model with the predict_proba interface the API expects
+"""
+import numpy as np
+import onnxruntime as ort
+
+
+class OnnxModel:
+    """Serve a pipeline exported by src.ml.train.to_onnx without sklearn dispatch overhead"""
+
+    def __init__(self, path: str, feature_names):
+        self._session = ort.InferenceSession(path, providers=["CPUExecutionProvider"])
+        self._input = self._session.get_inputs()[0].name
+        # Outputs are (label, probabilities)
+        self._proba = self._session.get_outputs()[1].name
+        self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        # Written by to_onnx; model_sha256 identifies the pickle the graph was exported from
+        self.metadata = dict(self._session.get_modelmeta().custom_metadata_map)
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        return self._session.run([self._proba], {self._input: X})[0]
@@ -1,14 +1,25 @@
+import numpy as np
 import pandas as pd
 from sklearn.metrics import classification_report, roc_auc_score
 import joblib
 
+from .data import FEATURE_COLS
+from .linear import fuse_linear, score_fused
 
-def evaluate(model_path: str = "models/latest.joblib", test_path: str = "data/processed/test.parquet"):
+
+def evaluate(model_path: str = "models/latest.joblib", test_path: str = "data/processed/test.feather"):
     model = joblib.load(model_path)
-    df = pd.read_parquet(test_path)
-    X_test = df.drop("Class", axis=1)
+    # Columns in the order the model was fitted on (the fused path is positional)
+    feature_cols = list(getattr(model, "feature_names_in_", FEATURE_COLS))
+    df = pd.read_feather(test_path, columns=feature_cols + ["Class"])
+    X_test = df[feature_cols].astype(np.float32, copy=False)
     y_test = df["Class"]
-    y_prob = model.predict_proba(X_test)[:, 1]
+    # Scaler folded into the LR weights: one matvec instead of the Pipeline's two passes
+    fused = fuse_linear(model)
+    if fused is not None:
+        y_prob = score_fused(X_test.to_numpy(), *fused)
+    else:
+        y_prob = model.predict_proba(X_test)[:, 1]
     y_pred = (y_prob >= 0.5).astype(int)
     report = classification_report(y_test, y_pred, output_dict=True)
     auc = roc_auc_score(y_test, y_prob)
@@ -0,0 +1,59 @@
+"""
+Fused StandardScaler + LogisticRegression scoring
+"""
+import math
+
+import numpy as np
+from scipy.special import expit
+
+# Optional numba kernel: one parallel pass computing X @ w + b and the sigmoid
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _score_kernel(X, w, b):
+        out = np.empty(X.shape[0])
+        for i in prange(X.shape[0]):
+            z = b
+            for j in range(X.shape[1]):
+                z += X[i, j] * w[j]
+            out[i] = 1.0 / (1.0 + math.exp(-z))
+        return out
+else:
+    _score_kernel = None
+
+
+def fuse_linear(pipe):
+    """
+    Fold an optional StandardScaler into a binary LogisticRegression.
+
+    Returns (w_eff, b_eff) such that expit(X @ w_eff + b_eff) equals
+    pipe.predict_proba(X)[:, 1], or None if the pipeline is not of that shape.
+    """
+    steps = dict(getattr(pipe, "steps", []))
+    clf = steps.get("clf")
+    if clf is None or not hasattr(clf, "coef_") or clf.coef_.shape[0] != 1:
+        return None
+    if set(steps) - {"scaler", "clf"}:
+        return None
+    w = clf.coef_[0].astype(np.float64)
+    b = float(clf.intercept_[0])
+    scaler = steps.get("scaler")
+    if scaler is not None:
+        # Fold only the steps the scaler applies: mean_ is set even when with_mean=False,
+        # and scale_ is None when with_std=False
+        if scaler.with_std:
+            w = w / scaler.scale_
+        if scaler.with_mean:
+            b = b - w @ scaler.mean_
+    return w, b
+
+
+def score_fused(X: np.ndarray, w: np.ndarray, b: float) -> np.ndarray:
+    """Fraud-class probabilities with a single matvec (numba kernel when installed)."""
+    if _score_kernel is not None:
+        return _score_kernel(np.ascontiguousarray(X), w, b)
+    return expit(X @ w + b)
@@ -1,40 +1,144 @@
 import os
+
+# Optional oneDAL acceleration of LogisticRegression (lbfgs/newton-cg); must patch before sklearn imports.
+# Models fitted this way pickle sklearnex classes, so loading them needs scikit-learn-intelex too.
+USE_SKLEARNEX = False
+if os.getenv("USE_SKLEARNEX") == "1":
+    try:
+        from sklearnex import patch_sklearn
+        patch_sklearn()
+        USE_SKLEARNEX = True
+    except ImportError:
+        print("USE_SKLEARNEX=1 but scikit-learn-intelex is not installed; using stock scikit-learn")
+
+import functools
+import hashlib
+import string
+import cloudpickle
 import mlflow
 import mlflow.sklearn
+import numpy as np
+import sklearn
 import pandas as pd
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import roc_auc_score
 
-from .data import prepare_data
-
-import os, mlflow
+from .data import prepare_data, FEATURE_COLS
 
 # Connect to MLflow server
 # Server uses file:///mlruns for both backend and artifacts
+# (the experiment itself is selected in train(), not at import time)
 mlflow.set_tracking_uri(os.getenv("MLFLOW_TRACKING_URI", "http://localhost:5000"))
-mlflow.set_experiment("credit-fraud")
-def load_configs():
+
+# MLmodel metadata written next to the manually saved artifacts; sklearn version is fixed per process
+_MLMODEL_TMPL = string.Template(string.Template("""artifact_path: model
+flavors:
+  python_function:
+    env:
+      conda: conda.yaml
+      virtualenv: python_env.yaml
+    loader_module: mlflow.sklearn
+    model_path: model.pkl
+    predict_fn: predict
+    python_version: 3.11.0
+  sklearn:
+    code: null
+    pickled_model: model.pkl
+    serialization_format: cloudpickle
+    sklearn_version: $sklearn_version
+mlflow_version: 2.16.2
+model_size_bytes: $model_size
+model_uuid: $run_id
+run_id: $run_id
+utc_time_created: '$start_time'
+""").safe_substitute(sklearn_version=sklearn.__version__))
+
+
+@functools.lru_cache(maxsize=None)
+def _load_yaml(path: str, mtime: float):
+    """Parse a YAML file once per modification time; mtime is only part of the cache key."""
     import yaml
-    with open("configs/base.yaml", "r") as f:
-        base = yaml.safe_load(f)
-    with open("configs/training.yaml", "r") as f:
-        train_cfg = yaml.safe_load(f)
+    # libyaml's C loader when PyYAML was built with it
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(path, "r") as f:
+        return yaml.load(f, Loader=loader)
+
+
+def load_configs():
+    base = _load_yaml("configs/base.yaml", os.path.getmtime("configs/base.yaml"))
+    train_cfg = _load_yaml("configs/training.yaml", os.path.getmtime("configs/training.yaml"))
     return base, train_cfg
 
 
+def to_onnx(pipe, n_features: int, model_sha256: str):
+    """
+    Serialize the fitted pipeline to ONNX, or return None when skl2onnx is missing or conversion fails.
+
+    model_sha256 (the hash of the pickle written alongside) is stored in the ONNX
+    metadata so the API only serves the graph next to the pickle it came from.
+    """
+    try:
+        from skl2onnx import convert_sklearn
+        from skl2onnx.common.data_types import FloatTensorType
+    except ImportError:
+        return None
+    try:
+        onx = convert_sklearn(
+            pipe,
+            initial_types=[("X", FloatTensorType([None, n_features]))],
+            # Plain (n, 2) probability tensor rather than a list of per-row dicts
+            options={id(pipe.steps[-1][1]): {"zipmap": False}},
+        )
+    except Exception as e:
+        # Optional export; never fail training over it
+        print(f"ONNX export skipped: {e}")
+        return None
+    entry = onx.metadata_props.add()
+    entry.key, entry.value = "model_sha256", model_sha256
+    return onx.SerializeToString()
+
+
+def warm_start_from(clf, model_path: str, n_features: int) -> str:
+    """
+    Seed a warm_start LogisticRegression with a prior model's weights.
+
+    Returns "<path>@<sha256 prefix>" for the seed that was used, or "cold" when
+    its weights do not fit this feature set.
+    """
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"warm_start_from model not found: {model_path}")
+    with open(model_path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:12]
+    try:
+        import joblib
+        prev = joblib.load(model_path)
+        prev_clf = prev.named_steps["clf"] if hasattr(prev, "named_steps") else prev
+        if prev_clf.coef_.shape != (1, n_features):
+            print(f"Cold start: {model_path} has coef shape {prev_clf.coef_.shape}")
+            return "cold"
+        clf.coef_ = prev_clf.coef_.copy()
+        clf.intercept_ = prev_clf.intercept_.copy()
+        clf.classes_ = np.array([0, 1])
+    except Exception as e:
+        print(f"Cold start: could not reuse previous weights ({e})")
+        return "cold"
+    return f"{model_path}@{digest}"
+
+
 def train():
     base, cfg = load_configs()
-    train_pq, test_pq = prepare_data(test_size=base["test_size"], random_state=base["random_state"])  # idempotent
+    train_path, test_path = prepare_data(test_size=base["test_size"], random_state=base["random_state"])  # idempotent
 
-    train_df = pd.read_parquet(train_pq)
-    test_df = pd.read_parquet(test_pq)
+    # Project to model inputs + target at read time - Time is never decoded
+    train_df = pd.read_feather(train_path, columns=FEATURE_COLS + ["Class"])
+    test_df = pd.read_feather(test_path, columns=FEATURE_COLS + ["Class"])
 
-    # Drop Time feature - not useful for prediction, only for record-keeping
-    X_train = train_df.drop(["Class", "Time"], axis=1, errors='ignore')
-    y_train = train_df["Class"]
-    X_test = test_df.drop(["Class", "Time"], axis=1, errors='ignore')
+    # float32 halves the bytes the scaler and scoring stream through
+    X_train = train_df[FEATURE_COLS].astype(np.float32, copy=False)
+    y_train = train_df["Class"].astype(np.int8, copy=False)
+    X_test = test_df[FEATURE_COLS].astype(np.float32, copy=False)
     y_test = test_df["Class"]
 
     steps = []
@@ -43,7 +147,13 @@ def train():
 
     model_cfg = cfg["model"]
     if model_cfg["type"] == "logistic_regression":
-        clf = LogisticRegression(**model_cfg["params"])
+        # Performance defaults; anything set in training.yaml wins
+        params = {"solver": "lbfgs", "n_jobs": -1, "max_iter": 200, **model_cfg["params"]}
+        # Seeding from a prior model is opt-in so identical runs give identical models
+        seed_path = model_cfg.get("warm_start_from")
+        params["warm_start"] = bool(seed_path)
+        clf = LogisticRegression(**params)
+        warm_start_seed = warm_start_from(clf, seed_path, X_train.shape[1]) if seed_path else "cold"
     else:
         raise ValueError("Unsupported model type")
 
@@ -56,13 +166,27 @@ def train():
         preds = pipe.predict_proba(X_test)[:, 1]
         auc = roc_auc_score(y_test, preds)
         mlflow.log_metric("auc", float(auc))
-        mlflow.log_params({"model": model_cfg["type"], **model_cfg["params"]})
+        mlflow.log_params({"model": model_cfg["type"], "use_sklearnex": USE_SKLEARNEX,
+                           "warm_start_seed": warm_start_seed, **params})
 
         # Save model locally as backup
         os.makedirs("models", exist_ok=True)
         model_path = "models/latest.joblib"
-        import joblib
-        joblib.dump(pipe, model_path)
+        # Pickled once with cloudpickle (MLflow's format); the same bytes back both
+        # the local copy and the mlruns model.pkl. joblib.load reads plain pickles.
+        model_bytes = cloudpickle.dumps(pipe)
+        with open(model_path, "wb") as f:
+            f.write(model_bytes)
+
+        # ONNX copy for onnxruntime serving (optional, needs skl2onnx)
+        onnx_path = "models/latest.onnx"
+        onnx_bytes = to_onnx(pipe, X_train.shape[1], hashlib.sha256(model_bytes).hexdigest())
+        if onnx_bytes is not None:
+            with open(onnx_path, "wb") as f:
+                f.write(onnx_bytes)
+        elif os.path.exists(onnx_path):
+            # Never leave a previous model's graph next to the new pickle
+            os.remove(onnx_path)
 
         # Log model to MLflow with artifacts
         model_name = os.getenv("MODEL_NAME", "credit-fraud")
@@ -75,45 +199,28 @@ def train():
         model_info = mlflow.sklearn.log_model(
             sk_model=pipe,
             artifact_path="model",
-            registered_model_name=model_name
+            registered_model_name=model_name,
+            extra_pip_requirements=["scikit-learn-intelex"] if USE_SKLEARNEX else None,
         )
 
         # WORKAROUND: When using HTTP tracking, artifacts aren't written to local mlruns
         # We need to manually save them so the Docker containers can access them
-        import shutil
-        import cloudpickle
-
         artifacts_dest = os.path.join("mlruns", str(experiment_id), run_id, "artifacts", "model")
         os.makedirs(artifacts_dest, exist_ok=True)
 
-        # Save the model using cloudpickle (MLflow's preferred format)
         model_pkl_path = os.path.join(artifacts_dest, "model.pkl")
         with open(model_pkl_path, 'wb') as f:
-            cloudpickle.dump(pipe, f)
+            f.write(model_bytes)
+        if onnx_bytes is not None:
+            with open(os.path.join(artifacts_dest, "model.onnx"), "wb") as f:
+                f.write(onnx_bytes)
 
         # Create MLmodel metadata file
-        import sklearn
-        mlmodel_content = f"""artifact_path: model
-flavors:
-  python_function:
-    env:
-      conda: conda.yaml
-      virtualenv: python_env.yaml
-    loader_module: mlflow.sklearn
-    model_path: model.pkl
-    predict_fn: predict
-    python_version: 3.11.0
-  sklearn:
-    code: null
-    pickled_model: model.pkl
-    serialization_format: cloudpickle
-    sklearn_version: {sklearn.__version__}
-mlflow_version: 2.16.2
-model_size_bytes: {os.path.getsize(model_pkl_path)}
-model_uuid: {run_id}
-run_id: {run_id}
-utc_time_created: '{int(run.info.start_time)}'
-"""
+        mlmodel_content = _MLMODEL_TMPL.substitute(
+            model_size=len(model_bytes),
+            run_id=run_id,
+            start_time=int(run.info.start_time),
+        )
         mlmodel_path = os.path.join(artifacts_dest, "MLmodel")
         with open(mlmodel_path, "w") as f:
             f.write(mlmodel_content)
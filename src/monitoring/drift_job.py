@@ -1,24 +1,34 @@
 import os
 import yaml
-import pandas as pd
+import pyarrow.parquet as pq
 from evidently.report import Report
 from evidently.metric_preset import DataDriftPreset
 
 
+def _read_sample(path: str, rows=None):
+    """Read a whole sample file, or just its first `rows` rows when a cap is set"""
+    if rows is None:
+        return pq.read_table(path).to_pandas()
+    # The samples are already shuffled, so the first batch is a random subset
+    return next(pq.ParquetFile(path).iter_batches(batch_size=rows)).to_pandas()
+
+
 def generate_report(cfg_path: str = "configs/monitoring.yaml"):
     with open(cfg_path, "r") as f:
         cfg = yaml.safe_load(f)
     ref = cfg.get("reference_sample_path")
     cur = cfg.get("current_sample_path")
     out_dir = cfg.get("report_output_dir", "reports/")
+    # None (the default) reports on the full samples; set to cap the rows per side
+    sample_rows = cfg.get("sample_rows")
     os.makedirs(out_dir, exist_ok=True)
 
     if not (os.path.exists(ref) and os.path.exists(cur)):
         print("Reference or current sample not found; skipping drift report.")
         return
 
-    ref_df = pd.read_parquet(ref)
-    cur_df = pd.read_parquet(cur)
+    ref_df = _read_sample(ref, sample_rows)
+    cur_df = _read_sample(cur, sample_rows)
 
     report = Report(metrics=[DataDriftPreset()])
     report.run(reference_data=ref_df, current_data=cur_df)
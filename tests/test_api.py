@@ -1,20 +1,161 @@
 """
 API endpoint tests
 """
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pytest
 from fastapi.testclient import TestClient
+from src.app import api
 from src.app.api import app
 
 client = TestClient(app)
 
+FEATURES = [f"V{i}" for i in range(1, 29)] + ["Amount"]
+
+
+class StubModel:
+    """Minimal fitted-model stand-in: fraud probability is the row's first feature"""
+
+    def __init__(self, fail_batches=False):
+        self.feature_names_in_ = np.array(FEATURES)
+        self.fail_batches = fail_batches
+        self.calls = []
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        self.calls.append(X.shape[0])
+        if self.fail_batches and X.shape[0] > 1:
+            raise ValueError("batch failed")
+        p = np.clip(X[:, 0], 0.0, 1.0)
+        return np.column_stack([1.0 - p, p])
 
-def test_health_endpoint():
+
+def test_health_endpoint(monkeypatch):
     """Test health check endpoint"""
+    # Reports 503 until a model has been loaded
+    monkeypatch.setattr(api, "_model", None)
+    response = client.get("/health")
+    assert response.status_code == 503
+
+    monkeypatch.setattr(api, "_model", StubModel())
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
 
 
+def test_load_model_loads_once_and_warms_up(monkeypatch):
+    """Test concurrent load_model calls share one load and the model is warmed up"""
+    stub = StubModel()
+    loads = []
+
+    def slow_load():
+        loads.append(1)
+        time.sleep(0.05)
+        return stub
+
+    monkeypatch.setattr(api, "_model", None)
+    monkeypatch.setattr(api, "FEATURE_ORDER", None)
+    monkeypatch.setattr(api, "_load_model", slow_load)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        models = list(pool.map(lambda _: api.load_model(), range(8)))
+
+    assert all(m is stub for m in models)
+    assert len(loads) == 1
+    assert api.FEATURE_ORDER == FEATURES
+    # One all-zero warm-up row scored before any traffic
+    assert stub.calls == [1]
+
+
+@pytest.fixture
+def stub_api(monkeypatch):
+    """Serve a StubModel with the database writer off; restores api state afterwards"""
+    stub = StubModel()
+    monkeypatch.setattr(api, "_model", stub)
+    monkeypatch.setattr(api, "FEATURE_ORDER", FEATURES)
+    monkeypatch.setattr(api, "DB_ENABLED", False)
+    monkeypatch.setattr(api, "_model_info", dict(api._model_info))
+    api._proba_cache.clear()
+    yield stub
+    api._proba_cache.clear()
+
+
+def _payload(v1):
+    payload = {c: 0.0 for c in FEATURES}
+    payload["V1"] = v1
+    return payload
+
+
+def test_predict_cache_hit_skips_model(stub_api):
+    """Test a repeated payload is answered from the cache without scoring"""
+    first = client.post("/predict", json=_payload(0.25))
+    second = client.post("/predict", json=_payload(0.25))
+
+    assert first.status_code == second.status_code == 200
+    assert first.json()["fraud_probability"] == pytest.approx(0.25)
+    assert second.json() == first.json()
+    assert stub_api.calls == [1]
+
+
+def test_reload_clears_prediction_cache(stub_api, monkeypatch):
+    """Test /reload drops cached probabilities so the new model scores the next request"""
+    client.post("/predict", json=_payload(0.25))
+    assert len(api._proba_cache) == 1
+
+    new_model = StubModel()
+    monkeypatch.setattr(api, "_load_model", lambda: new_model)
+    response = client.post("/reload")
+    assert response.status_code == 200
+    assert len(api._proba_cache) == 0
+
+    client.post("/predict", json=_payload(0.25))
+    # Warm-up row, then the request itself
+    assert new_model.calls == [1, 1]
+
+
+def test_reload_during_batched_predict_skips_cache(stub_api, monkeypatch):
+    """Test a probability computed by the old model is not cached after a reload"""
+
+    class ReloadingBatcher:
+        """Stands in for the batcher; a reload lands while the request awaits it"""
+
+        def is_active(self):
+            return True
+
+        async def predict_proba(self, X):
+            proba = stub_api.predict_proba(X)[0]
+            api._proba_cache.clear()
+            monkeypatch.setattr(api, "_model", StubModel())
+            return proba
+
+    monkeypatch.setattr(api, "_batcher", ReloadingBatcher())
+    response = client.post("/predict", json=_payload(0.25))
+
+    assert response.status_code == 200
+    assert len(api._proba_cache) == 0
+
+
+def test_predict_through_batcher(stub_api, monkeypatch):
+    """Test concurrent requests are scored by the batcher when startup events run"""
+    monkeypatch.setattr(api, "_model", None)
+    monkeypatch.setattr(api, "_load_model", lambda: stub_api)
+
+    with TestClient(app) as batched_client:
+        assert api._batcher._task is not None
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            responses = list(pool.map(
+                lambda v: batched_client.post("/predict", json=_payload(v)),
+                [i / 10 for i in range(8)],
+            ))
+
+    assert [r.status_code for r in responses] == [200] * 8
+    assert [r.json()["fraud_probability"] for r in responses] == pytest.approx([i / 10 for i in range(8)])
+    # Warm-up row plus the eight requests, however they were grouped
+    assert sum(stub_api.calls) == 9
+
+
 def test_model_info_endpoint():
     """Test model info endpoint"""
     response = client.get("/model_info")
@@ -0,0 +1,129 @@
+"""
+Prediction batching and background logging tests
+"""
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.app.batching import PredictionBatcher, PredictionLogger
+
+
+class RecordingModel:
+    """Scores a row as its first feature and records the size of every predict_proba call"""
+
+    def __init__(self, fail_batches=False):
+        self.fail_batches = fail_batches
+        self.calls = []
+
+    def predict_proba(self, X):
+        self.calls.append(X.shape[0])
+        if self.fail_batches and X.shape[0] > 1:
+            raise ValueError("batch failed")
+        return np.column_stack([1.0 - X[:, 0], X[:, 0]])
+
+
+def _score_concurrently(batcher, n_rows):
+    async def run():
+        batcher.start()
+        try:
+            rows = [np.full((1, 29), i / 10, dtype=np.float32) for i in range(n_rows)]
+            return await asyncio.gather(*(batcher.predict_proba(row) for row in rows))
+        finally:
+            await batcher.stop()
+
+    return [float(p[1]) for p in asyncio.run(run())]
+
+
+def test_batcher_coalesces_concurrent_rows():
+    """Test rows queued together are scored in one predict_proba call"""
+    model = RecordingModel()
+    batcher = PredictionBatcher(lambda: model, max_batch=16, max_wait_ms=50)
+
+    probs = _score_concurrently(batcher, 5)
+
+    assert model.calls == [5]
+    assert probs == pytest.approx([0.0, 0.1, 0.2, 0.3, 0.4])
+
+
+def test_batcher_falls_back_to_single_rows():
+    """Test a failing batch is rescored row by row so every caller still gets a result"""
+    model = RecordingModel(fail_batches=True)
+    batcher = PredictionBatcher(lambda: model, max_batch=16, max_wait_ms=50)
+
+    probs = _score_concurrently(batcher, 3)
+
+    assert model.calls == [3, 1, 1, 1]
+    assert probs == pytest.approx([0.0, 0.1, 0.2])
+
+
+def test_batcher_without_model_fails_requests():
+    """Test queued requests fail when no model is available"""
+    batcher = PredictionBatcher(lambda: None, max_wait_ms=1)
+
+    with pytest.raises(RuntimeError, match="model not available"):
+        _score_concurrently(batcher, 1)
+
+
+def test_logger_drops_records_when_queue_full():
+    """Test records beyond the queue bound are dropped instead of blocking"""
+    written = []
+    logger = PredictionLogger(written.extend, maxsize=2, flush_ms=10_000)
+
+    async def run():
+        logger.start()
+        # Writer has not run yet, so the queue fills up
+        for i in range(3):
+            logger.log({"id": i})
+        await logger.stop()
+
+    asyncio.run(run())
+
+    assert written == [{"id": 0}, {"id": 1}]
+
+
+def test_logger_stop_flushes_pending_records():
+    """Test records the writer is still collecting are written on stop"""
+    written = []
+    logger = PredictionLogger(written.extend, batch_size=100, flush_ms=10_000)
+
+    async def run():
+        logger.start()
+        for i in range(3):
+            logger.log({"id": i})
+        # Let the writer move the records into its pending batch
+        await asyncio.sleep(0.05)
+        assert written == []
+        await logger.stop()
+
+    asyncio.run(run())
+
+    assert written == [{"id": 0}, {"id": 1}, {"id": 2}]
+
+
+def test_logger_restarts_on_a_new_event_loop():
+    """Test the logger can be started and stopped again on a second event loop"""
+    written = []
+    logger = PredictionLogger(written.extend, flush_ms=10)
+
+    async def run(i):
+        logger.start()
+        logger.log({"id": i})
+        await asyncio.sleep(0.05)
+        assert logger.is_active()
+        await logger.stop()
+
+    asyncio.run(run(0))
+    asyncio.run(run(1))
+
+    assert written == [{"id": 0}, {"id": 1}]
+
+
+def test_logger_writes_inline_when_not_started():
+    """Test records are written immediately when no writer task is running"""
+    written = []
+    logger = PredictionLogger(written.extend)
+
+    logger.log({"id": 0})
+
+    assert written == [{"id": 0}]
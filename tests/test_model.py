@@ -90,3 +90,104 @@ def test_data_quality(test_data):
     # Class balance
     class_dist = test_data["Class"].value_counts(normalize=True)
     print(f"Class distribution: {class_dist.to_dict()}")
+
+
+@pytest.mark.parametrize("with_mean,with_std", [(True, True), (False, True), (True, False), (False, False)])
+def test_fused_linear_matches_pipeline(with_mean, with_std):
+    """Test fused scaler + LR scoring matches the Pipeline's predict_proba"""
+    import numpy as np
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+    from src.ml.linear import fuse_linear, score_fused
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(loc=3.0, scale=[1.0] * 28 + [250.0], size=(2000, 29)).astype(np.float32)
+    y = (X[:, 0] + 0.01 * X[:, -1] + rng.normal(size=2000) > 5.0).astype(int)
+    scaler = StandardScaler(with_mean=with_mean, with_std=with_std)
+    pipe = Pipeline([("scaler", scaler), ("clf", LogisticRegression(max_iter=500))]).fit(X, y)
+
+    fused = fuse_linear(pipe)
+    assert fused is not None, "Scaler + LR pipeline should be fusable"
+    expected = pipe.predict_proba(X)[:, 1]
+    actual = score_fused(X, *fused)
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-6)
+
+
+@pytest.fixture
+def tiny_csv(tmp_path):
+    """A small creditcard.csv lookalike: Time, V1-V28, Amount, Class with 25% fraud"""
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    n = 40
+    df = pd.DataFrame(rng.normal(size=(n, 28)), columns=[f"V{i}" for i in range(1, 29)])
+    df.insert(0, "Time", np.arange(n, dtype=float))
+    df["Amount"] = rng.uniform(1, 100, n)
+    df["Class"] = [1 if i % 4 == 0 else 0 for i in range(n)]
+    path = tmp_path / "creditcard.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def read_csv_calls(monkeypatch):
+    """Count pd.read_csv calls made by prepare_data"""
+    from src.ml import data
+
+    calls = []
+    real_read_csv = pd.read_csv
+
+    def counting_read_csv(*args, **kwargs):
+        calls.append(args)
+        return real_read_csv(*args, **kwargs)
+
+    monkeypatch.setattr(data.pd, "read_csv", counting_read_csv)
+    return calls
+
+
+def test_prepare_data_skips_when_outputs_current(tiny_csv, tmp_path, monkeypatch):
+    """Test a repeat call with the same CSV and split does not re-read the CSV"""
+    from src.ml import data
+
+    out_dir = str(tmp_path / "processed")
+    first = data.prepare_data(tiny_csv, out_dir, test_size=0.25, random_state=0)
+
+    def fail_read_csv(*args, **kwargs):
+        raise AssertionError("prepare_data re-read the CSV")
+
+    monkeypatch.setattr(data.pd, "read_csv", fail_read_csv)
+    assert data.prepare_data(tiny_csv, out_dir, test_size=0.25, random_state=0) == first
+
+
+def test_prepare_data_regenerates_on_new_inputs(tiny_csv, tmp_path, read_csv_calls):
+    """Test a touched CSV or a different test_size regenerates the outputs"""
+    from src.ml import data
+
+    out_dir = str(tmp_path / "processed")
+    data.prepare_data(tiny_csv, out_dir, test_size=0.25, random_state=0)
+    assert len(read_csv_calls) == 1
+
+    mtime = os.path.getmtime(tiny_csv) + 10
+    os.utime(tiny_csv, (mtime, mtime))
+    data.prepare_data(tiny_csv, out_dir, test_size=0.25, random_state=0)
+    assert len(read_csv_calls) == 2
+
+    _, test_path = data.prepare_data(tiny_csv, out_dir, test_size=0.5, random_state=0)
+    assert len(read_csv_calls) == 3
+    assert len(pd.read_feather(test_path)) == 20
+
+
+def test_prepare_data_regenerates_missing_output(tiny_csv, tmp_path, read_csv_calls):
+    """Test a deleted output file is written again instead of skipped"""
+    from src.ml import data
+
+    out_dir = str(tmp_path / "processed")
+    data.prepare_data(tiny_csv, out_dir, test_size=0.25, random_state=0)
+    reference_path = os.path.join(out_dir, "reference.parquet")
+    os.remove(reference_path)
+
+    data.prepare_data(tiny_csv, out_dir, test_size=0.25, random_state=0)
+
+    assert len(read_csv_calls) == 2
+    assert os.path.exists(reference_path)